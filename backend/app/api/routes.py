@@ -1,22 +1,42 @@
 """API routes: NWS proxy and glossary."""
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 
-from app.glossary_data import GLOSSARY, get_glossary_by_category, get_term
+from app.glossary_data import GLOSSARY_ETAG, GLOSSARY_JSON_BYTES, get_term
 from app.nws.client import nws
 from app.physics.advection_1d import solve_1d_advection
 from app.physics.advection_2d import solve_2d_advection_diffusion
 from app.physics.sounding import get_sounding
+from app.responses import NumpyJSONResponse
 
 router = APIRouter()
 
 
+def _json_bytes(raw: bytes) -> Response:
+    """Pass upstream JSON bytes through unchanged (no decode/re-encode)."""
+    return Response(content=raw, media_type="application/json")
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """Weak comparison of etag against If-None-Match, which may be * or a comma-separated list of tags."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    opaque = etag.removeprefix("W/")
+    return any(tag == "*" or tag.removeprefix("W/") == opaque for tag in (t.strip() for t in header.split(",")))
+
+
 # --- Glossary (education) ---
+_GLOSSARY_CACHE_HEADERS = {"ETag": GLOSSARY_ETAG, "Cache-Control": "public, max-age=86400"}
+
+
 @router.get("/glossary")
-async def glossary_list():
-    """Return all glossary entries, optionally grouped by category."""
-    return {"entries": GLOSSARY, "by_category": get_glossary_by_category()}
+async def glossary_list(request: Request):
+    """Return all glossary entries, optionally grouped by category (pre-serialized, static)."""
+    if _not_modified(request, GLOSSARY_ETAG):
+        return Response(status_code=304, headers=_GLOSSARY_CACHE_HEADERS)
+    return Response(content=GLOSSARY_JSON_BYTES, media_type="application/json", headers=_GLOSSARY_CACHE_HEADERS)
 
 
 @router.get("/glossary/{term}")
@@ -33,8 +53,16 @@ async def glossary_term(term: str):
 async def points(lat: float, lon: float):
     """Get NWS grid metadata and URLs for forecast and observations for a lat/lon."""
     try:
-        data = await nws.points(lat, lon)
-        return data
+        return _json_bytes(await nws.points(lat, lon))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+
+@router.get("/bundle")
+async def bundle(lat: float, lon: float):
+    """Points, forecast, hourly forecast and observation stations for a lat/lon in one call (fetched concurrently)."""
+    try:
+        return _json_bytes(await nws.bundle(lat, lon))
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
 
@@ -44,8 +72,9 @@ async def points(lat: float, lon: float):
 async def forecast(url: str):
     """Get zone forecast. Pass the forecastUrl from /points."""
     try:
-        data = await nws.forecast(url)
-        return data
+        return _json_bytes(await nws.forecast(url))
+    except ValueError as e:  # url is not on the NWS API host
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
 
@@ -54,8 +83,9 @@ async def forecast(url: str):
 async def forecast_hourly(url: str):
     """Get hourly forecast. Pass the forecastHourly URL from /points."""
     try:
-        data = await nws.forecast_hourly(url)
-        return data
+        return _json_bytes(await nws.forecast_hourly(url))
+    except ValueError as e:  # url is not on the NWS API host
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
 
@@ -65,8 +95,7 @@ async def forecast_hourly(url: str):
 async def observation_latest(station_id: str):
     """Get latest observation for a station (e.g. KORD)."""
     try:
-        data = await nws.observation_latest(station_id)
-        return data
+        return _json_bytes(await nws.observation_latest(station_id))
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
 
@@ -75,8 +104,9 @@ async def observation_latest(station_id: str):
 async def stations_observations(url: str):
     """List observation stations. Pass the observationStations URL from /points."""
     try:
-        data = await nws.stations_observations(url)
-        return data
+        return _json_bytes(await nws.stations_observations(url))
+    except ValueError as e:  # url is not on the NWS API host
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
 
@@ -86,8 +116,7 @@ async def stations_observations(url: str):
 async def gridpoint(grid_id: str, grid_x: int, grid_y: int):
     """Get raw gridpoint (model/NDFD) data for a grid cell. Used for raw vs corrected comparison."""
     try:
-        data = await nws.gridpoint(grid_id, grid_x, grid_y)
-        return data
+        return _json_bytes(await nws.gridpoint(grid_id, grid_x, grid_y))
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
 
@@ -99,14 +128,24 @@ async def physics_advection_1d(
     c: float = 1.0,
     num_steps: int = 50,
     output_interval: int = 10,
+    max_points: int = 200,
 ):
-    """Run 1D advection u_t + c u_x = 0; returns x and u(x) at time steps for viz."""
+    """Run 1D advection u_t + c u_x = 0; returns x and u(x) at time steps for viz (at most max_points per step)."""
     if nx < 10 or nx > 500:
         raise HTTPException(status_code=400, detail="nx must be between 10 and 500")
     if num_steps < 1 or num_steps > 500:
         raise HTTPException(status_code=400, detail="num_steps must be between 1 and 500")
+    if output_interval < 1:
+        raise HTTPException(status_code=400, detail="output_interval must be at least 1")
+    if max_points < 2:
+        raise HTTPException(status_code=400, detail="max_points must be at least 2")
     try:
-        return solve_1d_advection(nx=nx, c=c, num_steps=num_steps, output_interval=output_interval)
+        # Return the response directly so NumPy arrays skip jsonable_encoder and go straight to orjson
+        return NumpyJSONResponse(
+            solve_1d_advection(
+                nx=nx, c=c, num_steps=num_steps, output_interval=output_interval, max_points=max_points,
+            )
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -120,16 +159,23 @@ async def physics_advection_2d(
     diffusion: float = 0.001,
     num_steps: int = 30,
     output_interval: int = 10,
+    max_points: int = 200,
 ):
-    """Run 2D advection-diffusion; returns 2D field at time steps for viz."""
+    """Run 2D advection-diffusion; returns 2D field at time steps for viz (at most max_points per axis)."""
     if nx < 5 or nx > 80 or ny < 5 or ny > 80:
         raise HTTPException(status_code=400, detail="nx, ny must be between 5 and 80")
     if num_steps < 1 or num_steps > 200:
         raise HTTPException(status_code=400, detail="num_steps must be between 1 and 200")
+    if output_interval < 1:
+        raise HTTPException(status_code=400, detail="output_interval must be at least 1")
+    if max_points < 2:
+        raise HTTPException(status_code=400, detail="max_points must be at least 2")
     try:
-        return solve_2d_advection_diffusion(
-            nx=nx, ny=ny, cx=cx, cy=cy, diffusion=diffusion,
-            num_steps=num_steps, output_interval=output_interval,
+        return NumpyJSONResponse(
+            solve_2d_advection_diffusion(
+                nx=nx, ny=ny, cx=cx, cy=cy, diffusion=diffusion,
+                num_steps=num_steps, output_interval=output_interval, max_points=max_points,
+            )
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -157,6 +203,6 @@ async def alerts_active(zone: str | None = None, area: str | None = None):
             data = await nws.alerts_active_by_area(area)
         else:
             data = await nws.alerts_active(zone)
-        return data
+        return _json_bytes(data)
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
@@ -6,7 +6,10 @@ class Settings(BaseSettings):
     cache_ttl_seconds: int = 300  # 5 min for NWS data
     cache_sounding_wyoming_ttl_seconds: int = 21600  # 6 h (observed 2x daily)
     cache_sounding_model_ttl_seconds: int = 3600  # 1 h for RAP/HRRR
+    cache_max_entries: int = 4096  # per cache; least recently used entries are evicted past this
+    cache_sounding_max_entries: int = 256  # per sounding cache: each entry holds a full profile
     request_timeout_seconds: float = 15.0
+    sounding_warmup: bool = False  # at startup, fetch + cache every upper-air station (~30-60 UWyo requests)
 
     class Config:
         env_prefix = "APP_"
@@ -1,6 +1,10 @@
 """Glossary entries for tooltips and glossary panel. Phase 1+ terms."""
 from __future__ import annotations
 
+import hashlib
+
+import orjson
+
 GLOSSARY: list[dict[str, str]] = [
     {"term": "forecast", "definition": "A prediction of what the weather will be at a place and time, based on models and recent observations.", "category": "Data & forecast basics"},
     {"term": "observation", "definition": "A real measurement (temperature, wind, etc.) from a sensor or station right now or in the past.", "category": "Data & forecast basics"},
@@ -35,7 +39,7 @@ GLOSSARY: list[dict[str, str]] = [
 ]
 
 
-def get_glossary_by_category() -> dict[str, list[dict[str, str]]]:
+def _group_by_category() -> dict[str, list[dict[str, str]]]:
     out: dict[str, list[dict[str, str]]] = {}
     for entry in GLOSSARY:
         cat = entry["category"]
@@ -45,9 +49,20 @@ def get_glossary_by_category() -> dict[str, list[dict[str, str]]]:
     return out
 
 
+# GLOSSARY is static: build the lookup tables once at import
+_BY_CATEGORY = _group_by_category()
+_GLOSSARY_BY_TERM = {entry["term"].lower(): entry for entry in GLOSSARY}
+
+
+def get_glossary_by_category() -> dict[str, list[dict[str, str]]]:
+    return _BY_CATEGORY
+
+
 def get_term(term: str) -> dict[str, str] | None:
-    key = term.strip().lower()
-    for entry in GLOSSARY:
-        if entry["term"].lower() == key:
-            return entry
-    return None
+    return _GLOSSARY_BY_TERM.get(term.strip().lower())
+
+
+# /api/glossary body, serialized once; the ETag lets clients revalidate without re-downloading. Weak, because
+# GZipMiddleware serves the same representation both gzip-encoded and identity under this one tag.
+GLOSSARY_JSON_BYTES: bytes = orjson.dumps({"entries": GLOSSARY, "by_category": _BY_CATEGORY})
+GLOSSARY_ETAG = f'W/"{hashlib.sha1(GLOSSARY_JSON_BYTES).hexdigest()}"'
@@ -1,15 +1,25 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from app.api.routes import router
+from app.config import settings
 from app.nws.client import nws
+from app.physics.uwyo_sounding import get_sounding_warmup_all
+from app.responses import NumpyJSONResponse
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    nws.open()
+    # Runs in the background so startup doesn't wait on UWyo
+    warmup = asyncio.create_task(get_sounding_warmup_all()) if settings.sounding_warmup else None
     yield
+    if warmup is not None:
+        warmup.cancel()
     await nws.close()
 
 
@@ -18,8 +28,11 @@ app = FastAPI(
     description="NWS data and glossary for weather modeling app",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=NumpyJSONResponse,
 )
 
+# Physics arrays and NWS JSON compress 5-10x; tiny bodies aren't worth the CPU
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],
@@ -1,34 +1,92 @@
 """Simple in-memory cache with TTL for NWS API and sounding responses."""
 from __future__ import annotations
 
+import asyncio
 import time
-from typing import Any
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
 
 from app.config import settings
 
+# Every SWEEP_EVERY sets, drop up to SWEEP_LIMIT expired entries that were never read again
+SWEEP_EVERY = 64
+SWEEP_LIMIT = 64
+
 
 class TTLCache:
-    def __init__(self, ttl_seconds: int | None = None):
+    """
+    TTL + LRU cache. get/set are synchronous and never await, so on one event loop they need no lock.
+    Concurrent async fills of the same key are serialized by get_or_fetch: one in-flight task per key.
+    """
+
+    def __init__(self, ttl_seconds: int | None = None, max_size: int | None = None):
         self._ttl = ttl_seconds or settings.cache_ttl_seconds
-        self._store: dict[str, tuple[Any, float]] = {}
+        self._ttl_ns = self._ttl * 1_000_000_000
+        self._max_size = max_size or settings.cache_max_entries
+        # Ordered oldest -> most recently used, so LRU eviction is popitem(last=False)
+        # key -> (value, expires_ns) on the integer time.monotonic_ns() clock
+        self._store: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._pending: dict[str, asyncio.Future] = {}
+        self._sets = 0
 
     def get(self, key: str) -> Any | None:
         entry = self._store.get(key)
         if entry is None:
             return None
-        value, expires = entry
-        if time.monotonic() > expires:
+        value, expires_ns = entry
+        if time.monotonic_ns() > expires_ns:
             del self._store[key]
             return None
+        self._store.move_to_end(key)
         return value
 
     def set(self, key: str, value: Any) -> None:
-        self._store[key] = (value, time.monotonic() + self._ttl)
+        self._store[key] = (value, time.monotonic_ns() + self._ttl_ns)
+        self._store.move_to_end(key)
+        while len(self._store) > self._max_size:
+            self._store.popitem(last=False)
+        self._sets += 1
+        if self._sets % SWEEP_EVERY == 0:
+            self._sweep_expired()
+
+    def _sweep_expired(self) -> None:
+        now = time.monotonic_ns()
+        expired = []
+        for key, (_, expires_ns) in self._store.items():
+            if now > expires_ns:
+                expired.append(key)
+                if len(expired) >= SWEEP_LIMIT:
+                    break
+        for key in expired:
+            del self._store[key]
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return cached value or await fetch(); concurrent misses for the same key share one fetch."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._pending[key] = task
+            task.add_done_callback(lambda t: self._fetch_done(key, t))
+        # shield: one caller being cancelled must not cancel the fetch the others are waiting on
+        return await asyncio.shield(task)
+
+    def _fetch_done(self, key: str, task: asyncio.Future) -> None:
+        self._pending.pop(key, None)
+        # Calling exception() also marks a failure as retrieved when no waiter is left
+        if not task.cancelled() and task.exception() is None:
+            self.set(key, task.result())
 
 
 # Module-level cache for NWS responses
 nws_cache: TTLCache = TTLCache()
 
-# Sounding caches (different TTLs)
-wyoming_sounding_cache: TTLCache = TTLCache(ttl_seconds=settings.cache_sounding_wyoming_ttl_seconds)
-model_sounding_cache: TTLCache = TTLCache(ttl_seconds=settings.cache_sounding_model_ttl_seconds)
+# Sounding caches (different TTLs); freshness comes from the TTL, so keys carry no run time
+wyoming_sounding_cache: TTLCache = TTLCache(
+    ttl_seconds=settings.cache_sounding_wyoming_ttl_seconds, max_size=settings.cache_sounding_max_entries
+)
+model_sounding_cache: TTLCache = TTLCache(
+    ttl_seconds=settings.cache_sounding_model_ttl_seconds, max_size=settings.cache_sounding_max_entries
+)
@@ -1,34 +1,68 @@
-"""NWS API client: points, stations, forecasts, observations."""
+"""NWS API client: points, stations, forecasts, observations. Public methods return raw JSON bytes."""
 from __future__ import annotations
 
+import asyncio
+from urllib.parse import urlsplit
+
 import httpx
+import orjson
 from app.config import settings
 from app.nws.cache import nws_cache
 
 NWS_BASE = settings.nws_base_url
 TIMEOUT = settings.request_timeout_seconds
 USER_AGENT = "WeatherModelingApp/1.0 (educational project)"
+_NWS_BASE_PARTS = urlsplit(NWS_BASE.lower())
+
+
+def _nws_path(url: str) -> str:
+    """
+    Path (and query) under NWS_BASE for a URL from a /points response. Absolute URLs must use NWS_BASE's scheme and
+    host (case-insensitive); relative ones must start with a single /. Anything else raises ValueError.
+    """
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc:
+        if (parts.scheme.lower(), parts.netloc.lower()) != (_NWS_BASE_PARTS.scheme, _NWS_BASE_PARTS.netloc):
+            raise ValueError(f"Not an NWS API URL: {url}")
+        path = parts.path or "/"
+        return f"{path}?{parts.query}" if parts.query else path
+    if not url.startswith("/") or url.startswith("//"):
+        raise ValueError(f"Not an NWS API path: {url}")
+    return url
 
 
 class NWSClient:
     def __init__(self) -> None:
         self._client: httpx.AsyncClient | None = None
 
-    async def _get(self, path: str) -> dict:
-        url = f"{NWS_BASE}{path}"
-        cached = nws_cache.get(url)
-        if cached is not None:
-            return cached
+    def open(self) -> None:
+        """Create the pooled HTTP/2 client (called at app startup; every NWS call goes to one host)."""
         if self._client is None:
             self._client = httpx.AsyncClient(
+                base_url=NWS_BASE,
+                http2=True,
                 timeout=TIMEOUT,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=60.0),
                 headers={"User-Agent": USER_AGENT, "Accept": "application/json"},
             )
-        resp = await self._client.get(url)
+
+    async def _get_raw(self, path: str) -> bytes:
+        """Response body as bytes; cached as bytes so pass-through routes never decode/re-encode it."""
+        return await nws_cache.get_or_fetch(path, lambda: self._fetch(path))
+
+    async def _get(self, path: str) -> dict:
+        """Decoded JSON, for callers that need to inspect the response."""
+        return orjson.loads(await self._get_raw(path))
+
+    async def _fetch(self, path: str) -> bytes:
+        # Build the absolute URL here rather than trusting base_url: httpx sends an absolute path as-is
+        if not path.startswith("/") or path.startswith("//"):
+            raise ValueError(f"Not an NWS API path: {path}")
+        if self._client is None:
+            self.open()
+        resp = await self._client.get(NWS_BASE + path)
         resp.raise_for_status()
-        data = resp.json()
-        nws_cache.set(url, data)
-        return data
+        return resp.content
 
     async def close(self) -> None:
         if self._client:
@@ -36,54 +70,60 @@ class NWSClient:
             self._client = None
 
     # --- Points and grid ---
-    async def points(self, lat: float, lon: float) -> dict:
+    async def points(self, lat: float, lon: float) -> bytes:
         """Get grid metadata and forecast/observation station URLs for a lat/lon."""
-        return await self._get(f"/points/{lat:.4f},{lon:.4f}")
+        return await self._get_raw(f"/points/{lat:.4f},{lon:.4f}")
 
-    async def gridpoint(self, grid_id: str, grid_x: int, grid_y: int) -> dict:
+    async def gridpoint(self, grid_id: str, grid_x: int, grid_y: int) -> bytes:
         """Get raw gridded model/NDFD data for a grid cell (Phase 2 raw data)."""
-        return await self._get(f"/gridpoints/{grid_id}/{grid_x},{grid_y}")
+        return await self._get_raw(f"/gridpoints/{grid_id}/{grid_x},{grid_y}")
+
+    async def bundle(self, lat: float, lon: float) -> bytes:
+        """Points plus forecast, hourly forecast and observation stations; the three follow-ups run concurrently."""
+        points_raw = await self.points(lat, lon)
+        props = orjson.loads(points_raw)["properties"]
+        forecast, hourly, stations = await asyncio.gather(
+            self.forecast(props["forecast"]),
+            self.forecast_hourly(props["forecastHourly"]),
+            self.stations_observations(props["observationStations"]),
+        )
+        # Splice the upstream bodies into one JSON object without decoding/re-encoding them
+        return (
+            b'{"points":' + points_raw
+            + b',"forecast":' + forecast
+            + b',"forecast_hourly":' + hourly
+            + b',"stations":' + stations
+            + b"}"
+        )
 
     # --- Forecast ---
-    async def forecast(self, forecast_url: str) -> dict:
+    async def forecast(self, forecast_url: str) -> bytes:
         """Get zone forecast from points response."""
-        if forecast_url.startswith("http"):
-            path = forecast_url.replace(NWS_BASE, "")
-        else:
-            path = forecast_url
-        return await self._get(path)
-
-    async def forecast_hourly(self, hourly_url: str) -> dict:
-        if hourly_url.startswith("http"):
-            path = hourly_url.replace(NWS_BASE, "")
-        else:
-            path = hourly_url
-        return await self._get(path)
+        return await self._get_raw(_nws_path(forecast_url))
+
+    async def forecast_hourly(self, hourly_url: str) -> bytes:
+        return await self._get_raw(_nws_path(hourly_url))
 
     # --- Observations ---
-    async def stations_observations(self, stations_url: str) -> dict:
+    async def stations_observations(self, stations_url: str) -> bytes:
         """List observation stations (e.g. from points)."""
-        if stations_url.startswith("http"):
-            path = stations_url.replace(NWS_BASE, "")
-        else:
-            path = stations_url
-        return await self._get(path)
+        return await self._get_raw(_nws_path(stations_url))
 
-    async def observation_latest(self, station_id: str) -> dict:
+    async def observation_latest(self, station_id: str) -> bytes:
         """Latest observation for a station (e.g. KORD)."""
-        return await self._get(f"/stations/{station_id}/observations/latest")
+        return await self._get_raw(f"/stations/{station_id}/observations/latest")
 
     # --- Alerts ---
-    async def alerts_active(self, zone_id: str | None = None) -> dict:
+    async def alerts_active(self, zone_id: str | None = None) -> bytes:
         """Active alerts. zone_id optional (e.g. ILZ003)."""
         path = "/alerts/active"
         if zone_id:
             path += f"?zone={zone_id}"
-        return await self._get(path)
+        return await self._get_raw(path)
 
-    async def alerts_active_by_area(self, state: str) -> dict:
+    async def alerts_active_by_area(self, state: str) -> bytes:
         """Active alerts for a state (e.g. IL)."""
-        return await self._get(f"/alerts/active?area={state}")
+        return await self._get_raw(f"/alerts/active?area={state}")
 
 
 nws = NWSClient()
@@ -0,0 +1,38 @@
+"""
+Ahead-of-time build of the advection kernels with numba.pycc, so the first request skips JIT compilation.
+Run from backend/ at image/deploy build time: python -m app.physics._kernels_aot
+This writes app/physics/physics_kernels.*.so; the solvers import it when its kernel_version() matches the current
+sources and fall back to the JIT kernels otherwise.
+"""
+from __future__ import annotations
+
+import os
+
+from app.physics._kernels_version import KERNEL_VERSION
+
+
+def kernel_version():
+    """Stamp of the sources this module was built from (KERNEL_VERSION at build time)."""
+    return KERNEL_VERSION
+
+
+if __name__ == "__main__":
+    import numba
+    from numba.pycc import CC
+
+    from app.physics import _kernels
+    from app.physics._kernels import run_1d, run_2d
+
+    # pycc cannot link Numba's parallel (parfor) runtime, so run_2d is compiled against a serial step_2d.
+    # prange in a non-parallel compile is a plain range; fine at API grid sizes. Only done in the build process,
+    # so importing this module never touches the live JIT kernels.
+    _kernels.step_2d = numba.njit(fastmath=True, boundscheck=False)(_kernels.step_2d.py_func)
+
+    cc = CC("physics_kernels")
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+    cc.export("kernel_version", "i8()")(kernel_version)
+    # Same Python source as the JIT kernels, pinned to the float32 C-contiguous signatures the solvers use.
+    cc.export("run_1d", "void(f4[::1], f4[::1], f4, i8, i8, i8, f4[:, ::1])")(run_1d.py_func)
+    cc.export("run_2d", "void(f4[:, ::1], f4[:, ::1], f4, f4, f4, i8, i8, f4[:, :, ::1])")(run_2d.py_func)
+    cc.compile()
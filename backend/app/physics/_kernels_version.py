@@ -0,0 +1,15 @@
+"""
+Version stamp of the advection kernel sources, shared by the AOT build and the solvers that load its output.
+"""
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+_HERE = Path(__file__).parent
+
+# Digest of the kernel and AOT build sources, truncated to 63 bits so the compiled module can return it as an i8.
+# The solvers only use physics_kernels when its stamp matches, so a build left over from older sources is ignored.
+KERNEL_VERSION = int.from_bytes(
+    hashlib.sha1((_HERE / "_kernels.py").read_bytes() + (_HERE / "_kernels_aot.py").read_bytes()).digest()[:8], "big"
+) >> 1
@@ -0,0 +1,326 @@
+"""
+CAPE/CIN shared by the observed and model sounding paths.
+Results are memoized on the (p, T, Td) profile, so a repeated upstream sounding skips the parcel pipeline.
+_cape_cin_nounits is a pint-free port of MetPy's parcel_profile + cape_cin (same constants, LCL, LFC/EL
+selection and integration) on plain floats; MetPy itself is the fallback when it fails.
+"""
+from __future__ import annotations
+
+import math
+from functools import lru_cache
+from typing import Sequence
+
+import numpy as np
+
+try:
+    from numpy import trapezoid
+except ImportError:  # NumPy < 2.0
+    from numpy import trapz as trapezoid
+
+try:
+    from scipy.special import lambertw
+except ImportError:  # SciPy optional: without it (Romps LCL needs lambertw) CAPE/CIN goes through MetPy
+    lambertw = None
+
+try:
+    import numba
+except ImportError:  # Numba not installed: the moist-adiabat integration runs as plain Python
+    numba = None
+
+# metpy.constants (SI), so both paths produce the same numbers
+RD = 287.04749097718457
+RV = 461.52311572606084
+CP_D = 1004.6662184201462
+CP_V = 1860.078011865639
+CP_L = 4219.400000000001
+LV = 2500840.0
+T0 = 273.16
+ES_0C = 611.2
+EPSILON = 0.6219569100577033
+KAPPA = 0.28571428571428564
+
+# RK4 step for the moist adiabat, in ln(p): ~1e-4 K from MetPy's LSODA solve over a full sounding
+_MOIST_DLNP = 0.02
+
+_METPY: tuple | None = None
+
+
+def _metpy() -> tuple:
+    """(units, cape_cin, parcel_profile, dewpoint_from_relative_humidity), imported once on first use."""
+    global _METPY
+    if _METPY is None:
+        from metpy.units import units
+        from metpy.calc import cape_cin, parcel_profile, dewpoint_from_relative_humidity
+
+        _METPY = (units, cape_cin, parcel_profile, dewpoint_from_relative_humidity)
+    return _METPY
+
+
+def _sat_vapor_pressure(t_k):
+    """Saturation vapor pressure over liquid water (Pa), as MetPy's saturation_vapor_pressure."""
+    latent = LV - (CP_L - CP_V) * (t_k - T0)
+    return ES_0C * (T0 / t_k) ** ((CP_L - CP_V) / RV) * np.exp((LV / T0 - latent / t_k) / RV)
+
+
+def _sat_mixing_ratio(p_pa, t_k):
+    """Saturation mixing ratio (kg/kg); NaN where e_s >= p, as in MetPy."""
+    e_s = _sat_vapor_pressure(t_k)
+    return np.where(e_s >= p_pa, np.nan, EPSILON * e_s / (p_pa - e_s))
+
+
+def _virtual_temperature(t_k, w):
+    return t_k * (w + EPSILON) / (EPSILON * (1 + w))
+
+
+def _lcl(p_pa, t_k, td_k):
+    """LCL pressure (Pa) by Romps (2017), as MetPy's lcl. Scalars or arrays of surface values."""
+    w = _sat_mixing_ratio(p_pa, td_k)
+    q = w / (1 + w)
+    moist_heat_ratio = (CP_D + q * (CP_V - CP_D)) / (RD + q * (RV - RD))
+    spec_heat_diff = CP_L - CP_V
+    a = moist_heat_ratio + spec_heat_diff / RV
+    b = -(LV + spec_heat_diff * T0) / (RV * t_k)
+    c = b / a
+    rh = _sat_vapor_pressure(td_k) / _sat_vapor_pressure(t_k)
+    w_minus1 = lambertw(rh ** (1 / a) * c * np.exp(c), k=-1).real
+    t_lcl = c / w_minus1 * t_k
+    return p_pa * (t_lcl / t_k) ** moist_heat_ratio
+
+
+def _moist_dt_dlnp(p_pa, t_k):
+    """dT/dln(p) along the pseudo-adiabat (MetPy's moist_lapse ODE times p)."""
+    latent = LV - (CP_L - CP_V) * (t_k - T0)
+    e_s = ES_0C * (T0 / t_k) ** ((CP_L - CP_V) / RV) * math.exp((LV / T0 - latent / t_k) / RV)
+    if e_s >= p_pa:
+        return math.nan
+    rs = EPSILON * e_s / (p_pa - e_s)
+    return (RD * t_k + LV * rs) / (CP_D + LV * LV * rs * EPSILON / (RD * t_k * t_k))
+
+
+def _moist_lapse(p_pa, t_start, out):
+    """Integrate the pseudo-adiabat from (p_pa[0], t_start) through the levels p_pa with RK4 in ln(p)."""
+    t = t_start
+    out[0] = t
+    for i in range(1, p_pa.shape[0]):
+        lp = math.log(p_pa[i - 1])
+        span = math.log(p_pa[i]) - lp
+        n = max(1, int(math.ceil(abs(span) / _MOIST_DLNP)))
+        h = span / n
+        for _ in range(n):
+            k1 = _moist_dt_dlnp(math.exp(lp), t)
+            k2 = _moist_dt_dlnp(math.exp(lp + 0.5 * h), t + 0.5 * h * k1)
+            k3 = _moist_dt_dlnp(math.exp(lp + 0.5 * h), t + 0.5 * h * k2)
+            k4 = _moist_dt_dlnp(math.exp(lp + h), t + h * k3)
+            t += h * (k1 + 2.0 * k2 + 2.0 * k3 + k4) / 6.0
+            lp += h
+        out[i] = t
+
+
+def _moist_lapse_rows(p_pa, p_lcl_pa, first, t_start, out):
+    """
+    _moist_lapse for each row of a NaN-padded (nprof, nlev) pressure matrix.
+    Row r starts at its LCL p_lcl_pa[r] with t_start[r] and continues through p_pa[r, first[r]:] (descending).
+    """
+    for r in range(p_pa.shape[0]):
+        m = 0
+        while first[r] + m < p_pa.shape[1] and not math.isnan(p_pa[r, first[r] + m]):
+            m += 1
+        if m == 0:
+            continue
+        levels = np.empty(m + 1)
+        levels[0] = p_lcl_pa[r]
+        levels[1:] = p_pa[r, first[r]:first[r] + m]
+        temps = np.empty(m + 1)
+        _moist_lapse(levels, t_start[r], temps)
+        out[r, first[r]:first[r] + m] = temps[1:]
+
+
+if numba is not None:
+    # No fastmath: NaN (undefined mixing ratio) must propagate as it does in MetPy
+    _moist_dt_dlnp = numba.njit(cache=True)(_moist_dt_dlnp)
+    _moist_lapse = numba.njit(cache=True)(_moist_lapse)
+    # Serial: a parallel kernel launched from the warm-up alongside step_2d aborts under the workqueue threading layer
+    _moist_lapse_rows = numba.njit(cache=True)(_moist_lapse_rows)
+    # Compile at import so the first sounding request doesn't pay JIT latency
+    _moist_lapse(np.array([100000.0, 90000.0]), 290.0, np.empty(2))
+    _moist_lapse_rows(np.array([[100000.0, 90000.0]]), np.array([95000.0]), np.array([1]), np.array([290.0]), np.empty((1, 2)))
+
+
+def _parcel_profile(p_hpa: np.ndarray, t_k: float, td_k: float) -> np.ndarray:
+    """Surface parcel temperature (K) at each level: dry adiabat to the LCL, pseudo-adiabat above."""
+    p_lcl = float(_lcl(p_hpa[0] * 100.0, t_k, td_k)) / 100.0
+    lower = p_hpa >= p_lcl
+    parcel = np.empty_like(p_hpa)
+    parcel[lower] = t_k * (p_hpa[lower] / p_hpa[0]) ** KAPPA
+    upper = ~lower
+    if upper.any():
+        # MetPy starts the moist adiabat from the dry-adiabat temperature at the LCL; duplicates are solved once
+        unique, inverse = np.unique(p_hpa[upper], return_inverse=True)
+        levels = np.concatenate(([p_lcl], unique[::-1])) * 100.0
+        temps = np.empty_like(levels)
+        _moist_lapse(levels, t_k * (p_lcl / p_hpa[0]) ** KAPPA, temps)
+        parcel[upper] = temps[1:][::-1][inverse]
+    return parcel
+
+
+def _intersections(p_hpa, a, b, direction: str) -> tuple[np.ndarray, np.ndarray]:
+    """Crossings of a and b, interpolated in ln(p); metpy.calc.find_intersections with log_x=True."""
+    x = np.log(p_hpa)
+    nearest = np.nonzero(np.diff(np.sign(a - b)))[0]
+    nxt = nearest + 1
+    sign_change = np.sign(a[nxt] - b[nxt])
+    x0, x1 = x[nearest], x[nxt]
+    a0, a1 = a[nearest], a[nxt]
+    dy0 = a0 - b[nearest]
+    dy1 = a1 - b[nxt]
+    ix = (dy1 * x0 - dy0 * x1) / (dy1 - dy0)
+    iy = ((ix - x0) / (x1 - x0)) * (a1 - a0) + a0
+    if len(ix) == 0:
+        return ix, iy
+    ix = np.exp(ix)
+    keep = np.ediff1d(ix, to_end=1) != 0
+    if direction == "increasing":
+        keep &= sign_change > 0
+    elif direction == "decreasing":
+        keep &= sign_change < 0
+    return ix[keep], iy[keep]
+
+
+def _lfc(p_hpa, tv, td_k, pv) -> float:
+    """Bottom-most LFC (hPa) or NaN; metpy.calc.lfc(which='bottom') on virtual temperatures."""
+    if np.isclose(pv[0], tv[0]):
+        x, _ = _intersections(p_hpa[1:], pv[1:], tv[1:], "increasing")
+    else:
+        x, _ = _intersections(p_hpa, pv, tv, "increasing")
+    this_lcl = float(_lcl(p_hpa[0] * 100.0, pv[0], td_k[0])) / 100.0
+    if len(x) == 0:
+        mask = p_hpa < this_lcl
+        if np.all((pv[mask] < tv[mask]) | np.isclose(pv[mask], tv[mask])):
+            return math.nan
+        return this_lcl
+    idx = x < this_lcl
+    if not idx.any():
+        el_p, _ = _intersections(p_hpa[1:], pv[1:], tv[1:], "decreasing")
+        if el_p.size and el_p.min() > this_lcl:
+            return math.nan
+        return this_lcl
+    return float(x[idx][0])
+
+
+def _el(p_hpa, tv, td_k, pv) -> float:
+    """Top-most EL (hPa) or NaN; metpy.calc.el(which='top') on virtual temperatures."""
+    if pv[-1] > tv[-1]:
+        return math.nan
+    x, _ = _intersections(p_hpa[1:], pv[1:], tv[1:], "decreasing")
+    lcl_p = float(_lcl(p_hpa[0] * 100.0, tv[0], td_k[0])) / 100.0
+    if len(x) > 0 and x[-1] < lcl_p:
+        return float(x[x < lcl_p][-1])
+    return math.nan
+
+
+def _cape_cin_nounits(p_hpa: Sequence[float], t_c: Sequence[float], td_c: Sequence[float]) -> tuple[float, float]:
+    """Surface-based (CAPE, CIN) in J/kg on plain arrays; mirrors MetPy's parcel_profile + cape_cin."""
+    p = np.asarray(p_hpa, dtype=float)
+    t = np.asarray(t_c, dtype=float) + 273.15
+    td = np.asarray(td_c, dtype=float) + 273.15
+    return _cape_cin_from_parcel(p, t, td, _parcel_profile(p, t[0], td[0]))
+
+
+def _cape_cin_from_parcel(p, t, td, parcel) -> tuple[float, float]:
+    """MetPy's cape_cin for p (hPa) and T, Td, parcel (K) arrays, surface first."""
+    keep = ~(np.isnan(p) | np.isnan(t) | np.isnan(td) | np.isnan(parcel))
+    p, t, td, parcel = p[keep], t[keep], td[keep], parcel[keep]
+
+    p_lcl = float(_lcl(p[0] * 100.0, t[0], td[0])) / 100.0
+    # Parcel keeps its surface mixing ratio below the LCL and is saturated above it
+    w_parcel = np.where(p > p_lcl, _sat_mixing_ratio(p[0] * 100.0, td[0]), _sat_mixing_ratio(p * 100.0, parcel))
+    tv = _virtual_temperature(t, _sat_mixing_ratio(p * 100.0, td))
+    pv = _virtual_temperature(parcel, w_parcel)
+
+    lfc_p = _lfc(p, tv, td, pv)
+    if math.isnan(lfc_p):
+        return 0.0, 0.0
+    el_p = _el(p, tv, td, pv)
+    if math.isnan(el_p):
+        el_p = p[-1]
+
+    # Buoyancy with its zero crossings added as nodes, ascending in pressure
+    y = pv - tv
+    cx, cy = _intersections(p[1:], y[1:], np.zeros_like(y[1:]), "all")
+    x = np.concatenate((p, cx))
+    y = np.concatenate((y, cy))
+    order = np.argsort(x)
+    x, y = x[order], y[order]
+    keep = np.ediff1d(x, to_end=[1]) > 1e-6
+    x, y = x[keep], y[keep]
+
+    in_cape = ((x < lfc_p) | np.isclose(x, lfc_p)) & ((x > el_p) | np.isclose(x, el_p))
+    cape = RD * trapezoid(y[in_cape], np.log(x[in_cape]))
+    in_cin = (x > lfc_p) | np.isclose(x, lfc_p)
+    cin = RD * trapezoid(y[in_cin], np.log(x[in_cin]))
+    return float(cape), float(min(cin, 0.0))
+
+
+def cape_cin_batch(p_hpa: np.ndarray, t_c: np.ndarray, td_c: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Surface-based (CAPE, CIN) in J/kg for many soundings at once, as (nprof, nlev) arrays (structure of arrays).
+    Rows are surface-up with NaN padding at the top. LCLs, dry adiabats and the moist-adiabat integrations run
+    across all profiles together; only the LFC/EL bookkeeping is per profile. Rows with under 2 levels get NaN,
+    as do all rows without SciPy (callers fall back to surface_cape_cin, which uses MetPy).
+    """
+    p = np.asarray(p_hpa, dtype=float)
+    t = np.asarray(t_c, dtype=float) + 273.15
+    td = np.asarray(td_c, dtype=float) + 273.15
+    nprof, nlev = p.shape
+    cape = np.full(nprof, np.nan)
+    cin = np.full(nprof, np.nan)
+    if nprof == 0 or lambertw is None:
+        return cape, cin
+
+    p0, t0, td0 = p[:, 0], t[:, 0], td[:, 0]
+    p_lcl = _lcl(p0 * 100.0, t0, td0) / 100.0
+    with np.errstate(invalid="ignore"):
+        parcel = t0[:, None] * (p / p0[:, None]) ** KAPPA
+        upper = p < p_lcl[:, None]
+    # Rows descend in pressure, so the levels above the LCL are a suffix starting at `first`
+    first = np.where(upper.any(axis=1), upper.argmax(axis=1), nlev)
+    t_start = t0 * (p_lcl / p0) ** KAPPA
+    _moist_lapse_rows(p * 100.0, p_lcl * 100.0, first, t_start, parcel)
+
+    for r in range(nprof):
+        if np.count_nonzero(~np.isnan(p[r])) < 2:
+            continue
+        try:
+            cape[r], cin[r] = _cape_cin_from_parcel(p[r], t[r], td[r], parcel[r])
+        except Exception:
+            continue
+    return cape, cin
+
+
+def _cape_cin_metpy(p_hpa: tuple[float, ...], t_c: tuple[float, ...], td_c: tuple[float, ...]) -> tuple[float, float]:
+    units, cape_cin, parcel_profile, _ = _metpy()
+    p = np.array(p_hpa) * units.hPa
+    T = np.array(t_c) * units.degC
+    Td = np.array(td_c) * units.degC
+    parcel = parcel_profile(p, T[0], Td[0])
+    cape, cin = cape_cin(p, T, Td, parcel)
+    cape_val = float(cape.to(units("J/kg")).magnitude) if cape is not None else 0.0
+    cin_val = float(cin.to(units("J/kg")).magnitude) if cin is not None else 0.0
+    return cape_val, cin_val
+
+
+@lru_cache(maxsize=256)
+def _cape_cin_cached(p_hpa: tuple[float, ...], t_c: tuple[float, ...], td_c: tuple[float, ...]) -> tuple[float, float]:
+    if lambertw is not None:
+        try:
+            cape, cin = _cape_cin_nounits(p_hpa, t_c, td_c)
+            if math.isfinite(cape) and math.isfinite(cin):
+                return cape, cin
+        except Exception:
+            pass
+    return _cape_cin_metpy(p_hpa, t_c, td_c)
+
+
+def surface_cape_cin(p_hpa: Sequence[float], t_c: Sequence[float], td_c: Sequence[float]) -> tuple[float, float]:
+    """Surface-based (CAPE, CIN) in J/kg for a profile ordered surface-up. Raises if MetPy fails."""
+    return _cape_cin_cached(tuple(p_hpa), tuple(t_c), tuple(td_c))
@@ -6,6 +6,42 @@ from __future__ import annotations
 
 import numpy as np
 
+try:
+    # AOT-compiled kernels (python -m app.physics._kernels_aot): no JIT cost at startup or first request.
+    # A build from older kernel sources (or without a version stamp) is skipped in favour of the JIT kernels.
+    from app.physics._kernels_version import KERNEL_VERSION
+    from app.physics.physics_kernels import kernel_version, run_1d
+
+    if kernel_version() != KERNEL_VERSION:
+        raise ImportError("physics_kernels is stale; rebuild with python -m app.physics._kernels_aot")
+except ImportError:
+    try:
+        from app.physics._kernels import run_1d
+    except ImportError:  # Numba not installed: use the NumPy loop below
+        run_1d = None
+
+
+def _step_upwind_numpy(u: np.ndarray, u_new: np.ndarray, cdt_dx: float, sign: int) -> None:
+    """One upwind step with NumPy (fallback when Numba is unavailable). Writes every cell of u_new."""
+    # np.roll(u, sign)[i] == u[i - sign]: the upstream donor cell, with the periodic wrap built in
+    np.subtract(u, np.roll(u, sign), out=u_new)
+    u_new *= -abs(cdt_dx)
+    u_new += u
+
+
+def _run_numpy(
+    u: np.ndarray, u_new: np.ndarray, cdt_dx: float, sign: int, num_steps: int, output_interval: int, out: np.ndarray
+) -> None:
+    """Same contract as the jitted run_1d: u in out[0] and after every output_interval-th step."""
+    out[0] = u
+    k = 1
+    for n in range(1, num_steps + 1):
+        _step_upwind_numpy(u, u_new, cdt_dx, sign)
+        u, u_new = u_new, u
+        if n % output_interval == 0:
+            out[k] = u
+            k += 1
+
 
 def solve_1d_advection(
     *,
@@ -13,35 +49,40 @@ def solve_1d_advection(
     c: float = 1.0,
     num_steps: int = 50,
     output_interval: int = 10,
+    max_points: int = 200,
 ) -> dict:
     """
     Solve u_t + c u_x = 0 on [0, 1] with periodic BC and Gaussian initial condition.
     c = advection speed (grid cells per time step when dt/dx chosen for CFL=1).
-    Returns dict with x, and list of (step, u) for plotting.
+    Returns dict with x, and list of (step, u) for plotting; arrays are NumPy (serialize with orjson).
+    Output is decimated to every `stride`-th point so at most max_points are sent (the solve uses all nx).
     """
     dx = 1.0 / (nx - 1)
     # CFL = c * dt / dx = 1 => dt = dx / c
     dt = dx / abs(c) if c != 0 else dx
-    x = np.linspace(0, 1, nx)
+    # float32 state: plenty for chart pixels, half the bytes per step and in the response
+    x = np.linspace(0, 1, nx, dtype=np.float32)
 
     # Gaussian initial condition
     u = np.exp(-40 * (x - 0.25) ** 2)
 
-    results = [{"step": 0, "u": u.tolist()}]
-    for n in range(1, num_steps + 1):
-        u_new = u.copy()
-        if c >= 0:
-            u_new[1:] = u[1:] - c * dt / dx * (u[1:] - u[:-1])
-            u_new[0] = u[0] - c * dt / dx * (u[0] - u[-1])  # periodic
-        else:
-            u_new[:-1] = u[:-1] - c * dt / dx * (u[1:] - u[:-1])
-            u_new[-1] = u[-1] - c * dt / dx * (u[0] - u[-1])  # periodic
-        u = u_new
-        if n % output_interval == 0:
-            results.append({"step": n, "u": u.tolist()})
+    cdt_dx = np.float32(c * dt / dx)
+    sign = 1 if c >= 0 else -1
+    # Two buffers allocated once; each step writes every cell of u_new, then they swap
+    u_new = np.empty_like(u)
+    # The whole time loop runs in one kernel call, which fills one row per snapshot
+    out = np.empty((1 + num_steps // output_interval, nx), dtype=np.float32)
+    run = run_1d if run_1d is not None else _run_numpy
+    run(u, u_new, cdt_dx, sign, num_steps, output_interval, out)
+
+    stride = max(1, -(-nx // max_points))
+    # One contiguous copy of the decimated snapshots; its rows serialize directly via orjson
+    snaps = np.ascontiguousarray(out[:, ::stride])
+    results = [{"step": k * output_interval, "u": snaps[k]} for k in range(len(snaps))]
 
     return {
-        "x": x.tolist(),
+        "x": x[::stride].copy(),
+        "stride": stride,
         "c": c,
         "dt": dt,
         "dx": dx,
@@ -5,29 +5,148 @@ Returns same shape as Wyoming sounding for frontend compatibility.
 """
 from __future__ import annotations
 
+import time
 from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
 from typing import Any
 
 import numpy as np
 
+from app.physics._thermo import surface_cape_cin
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # SciPy optional: nearest grid point falls back to the full-grid scan
+    cKDTree = None
+
+# (model, grid shape, corner coordinates) -> KD-tree over the flattened (lat, lon) grid. Model grids are static,
+# so each tree is built once per process and later lookups skip the full-grid distance array. False marks a grid
+# with non-finite coordinates, which always takes the full-grid scan.
+_GRID_TREES: dict[tuple, cKDTree | bool] = {}
+
+# (model, run_time) -> (decoded isobaric TMP/DPT datasets, time.monotonic() expiry, local GRIB subset). One decode
+# per run serves every point; entries live for one model cycle, after which a newer run supersedes them.
+_HERBIE_DS_CACHE: dict[tuple[str, str], tuple[tuple, float, Path]] = {}
+_HERBIE_DS_TTL_SECONDS = 3 * 3600
+
+
+# RAP/HRRR cycle length used for the run time; divides a day, so epoch buckets line up with 00/03/.../21 UTC
+_RUN_SECONDS = 3 * 3600
+
 
 def _run_time_utc() -> str:
     """Return latest RAP/HRRR run time as 'YYYY-MM-DD HH' (UTC). RAP runs 00, 03, ..., 21."""
-    now = datetime.now(timezone.utc)
-    hour = (now.hour // 3) * 3
-    run = now.replace(hour=hour, minute=0, second=0, microsecond=0)
-    return run.strftime("%Y-%m-%d %H")
+    return _format_run_time(int(time.time()) // _RUN_SECONDS)
+
+
+@lru_cache(maxsize=1)
+def _format_run_time(quantum: int) -> str:
+    """Run time string for a 3-hour bucket; formatted once per bucket."""
+    return datetime.fromtimestamp(quantum * _RUN_SECONDS, timezone.utc).strftime("%Y-%m-%d %H")
+
+
+def _grid_lon(lon: float) -> float:
+    """Longitude in the 0-360 convention of the model grids."""
+    return lon if 0 <= lon <= 360 else (lon + 360) if lon < 0 else lon
 
 
 def _nearest_point_index(lat_2d: np.ndarray, lon_2d: np.ndarray, lat: float, lon: float) -> tuple[int, int]:
     """Return (iy, ix) of nearest grid point. lon_2d may be 0-360."""
-    lon_sel = lon if 0 <= lon <= 360 else (lon + 360) if lon < 0 else lon
-    dist = (lat_2d - lat) ** 2 + (lon_2d - lon_sel) ** 2
-    flat_idx = np.nanargmin(np.where(np.isfinite(dist), dist, np.inf))
+    lon_sel = _grid_lon(lon)
+    # float32 distances: half the bytes per pass over the grid, ample precision to rank neighbouring points
+    dlat = np.subtract(lat_2d, lat, dtype=np.float32)
+    dlon = np.subtract(lon_2d, lon_sel, dtype=np.float32)
+    # Squared distance built in place: one temporary per term instead of one per operation
+    dlat *= dlat
+    dlon *= dlon
+    dlat += dlon
+    # nanargmin skips NaN cells itself; no masked copy of the grid needed
+    flat_idx = int(np.nanargmin(dlat))
     iy, ix = np.unravel_index(flat_idx, lat_2d.shape)
     return int(iy), int(ix)
 
 
+def _nearest_grid_point(model: str, lat_2d: np.ndarray, lon_2d: np.ndarray, lat: float, lon: float) -> tuple[int, int]:
+    """Return (iy, ix) of nearest grid point using a KD-tree cached per model grid."""
+    if cKDTree is None or lat_2d.ndim != 2:
+        return _nearest_point_index(lat_2d, lon_2d, lat, lon)
+    # Corners as bytes, so a NaN corner still matches its own key
+    corners = np.array([lat_2d[0, 0], lon_2d[0, 0], lat_2d[-1, -1], lon_2d[-1, -1]], dtype=np.float64).tobytes()
+    key = (model, lat_2d.shape, corners)
+    tree = _GRID_TREES.get(key)
+    if tree is None:
+        coords = np.column_stack([lat_2d.ravel(), lon_2d.ravel()])
+        tree = cKDTree(coords) if np.isfinite(coords).all() else False
+        _GRID_TREES[key] = tree
+    if tree is False:
+        return _nearest_point_index(lat_2d, lon_2d, lat, lon)
+    _, flat = tree.query((lat, _grid_lon(lon)))
+    iy, ix = divmod(int(flat), lat_2d.shape[1])
+    return iy, ix
+
+
+def _temp_var(ds) -> Any:
+    """Name of the isobaric temperature variable in ds, or None."""
+    for v in ds.data_vars:
+        vstr = str(ds[v].attrs.get("GRIB_shortName", v)).lower()
+        vlow = str(v).lower()
+        if (vstr in ("t", "tmp") or "tmp" in vlow) and "2" not in str(ds[v].dims):
+            return v
+    return next((v for v in ds.data_vars if "tmp" in str(v).lower() or v == "t"), None)
+
+
+def _dpt_var(ds) -> Any:
+    """Name of the isobaric dewpoint variable in ds, or None."""
+    for v in ds.data_vars:
+        vstr = str(ds[v].attrs.get("GRIB_shortName", v)).lower()
+        if "dpt" in vstr or "dp" == vstr or "dpt" in str(v).lower():
+            return v
+    return next((v for v in ds.data_vars if "dpt" in str(v).lower() or "dew" in str(v).lower()), None)
+
+
+def _release_run(datasets: tuple, grib: Path) -> None:
+    """Close an expired run's datasets and delete its GRIB subset and cfgrib index files."""
+    for d in datasets:
+        d.close()
+    for f in (grib, *grib.parent.glob(f"{grib.name}.*.idx")):
+        try:
+            f.unlink()
+        except OSError:
+            pass
+
+
+def _isobaric_datasets(run_time: str, model: str, product: str) -> tuple:
+    """
+    Decode TMP and DPT on isobaric levels with a single Herbie request; raises if the run is unavailable.
+    Shared through _HERBIE_DS_CACHE, so other points in the same run skip the download and cfgrib decode.
+    """
+    key = (model, run_time)
+    now = time.monotonic()
+    entry = _HERBIE_DS_CACHE.get(key)
+    if entry is not None and entry[1] > now:
+        return entry[0]
+    # Drop expired runs before decoding a new one: an HRRR decode is hundreds of MB, in memory and on disk
+    for k in [k for k, (_, expires, _) in _HERBIE_DS_CACHE.items() if expires <= now]:
+        datasets, _, grib = _HERBIE_DS_CACHE.pop(k)
+        _release_run(datasets, grib)
+
+    from herbie import Herbie
+
+    H = Herbie(run_time, model=model, product=product, fxx=0)
+    search = ":(?:TMP|DPT):[0-9]+ mb"
+    # Keep the GRIB subset and its cfgrib index while the run is cached (a restart within the cycle reuses both);
+    # _release_run deletes them when the entry expires
+    ds = H.xarray(search, remove_grib=False, backend_kwargs={"indexpath": "{path}.{short_hash}.idx"})
+    datasets = [d for d in (ds if isinstance(ds, list) else [ds]) if d is not None]
+    if not datasets:
+        raise ValueError(f"no isobaric TMP/DPT in {model} {run_time}")
+    iso = tuple(d for d in datasets if "isobaricInhPa" in d.dims or "isobaric" in str(d.dims).lower())
+    result = iso or tuple(datasets)
+    _HERBIE_DS_CACHE[key] = (result, now + _HERBIE_DS_TTL_SECONDS, Path(H.get_localFilePath(search)))
+    return result
+
+
 def get_model_sounding(
     lat: float,
     lon: float,
@@ -43,31 +162,27 @@ def get_model_sounding(
     product = "awp130pgrb" if model == "rap" else "prs"
 
     try:
-        from herbie import Herbie
+        import herbie  # noqa: F401
     except ImportError:
         return None
 
+    # Temperature and dewpoint on isobaric levels, from one (cached) decode of the run
     try:
-        H = Herbie(run_time, model=model, product=product, fxx=0)
+        datasets = _isobaric_datasets(run_time, model, product)
     except Exception:
         return None
-
-    # Load temperature on isobaric levels
-    try:
-        ds_t = H.xarray(":TMP:[0-9]+ mb", remove_grib=True)
-    except Exception:
+    # Dewpoint first: without real DPT there is no meaningful CAPE/CIN (Td = T gives 0), so skip all T work
+    ds_dpt = next((d for d in datasets if _dpt_var(d) is not None), None)
+    if ds_dpt is None:
         return None
-    if ds_t is None:
-        return None
-    if isinstance(ds_t, list):
-        ds_t = next((d for d in ds_t if "isobaricInhPa" in d.dims or "isobaric" in str(d.dims).lower()), ds_t[0] if ds_t else None)
+    ds_t = next((d for d in datasets if _temp_var(d) is not None), None)
     if ds_t is None:
         return None
 
     # Latitude/longitude and nearest point
     lat_2d = np.asarray(ds_t.latitude) if hasattr(ds_t, "latitude") else np.asarray(ds_t.lat)
     lon_2d = np.asarray(ds_t.longitude) if hasattr(ds_t, "longitude") else np.asarray(ds_t.lon)
-    iy, ix = _nearest_point_index(lat_2d, lon_2d, lat, lon)
+    iy, ix = _nearest_grid_point(model, lat_2d, lon_2d, lat, lon)
 
     # Pressure dimension
     pres_dim = None
@@ -78,46 +193,27 @@ def get_model_sounding(
     if pres_dim is None:
         pres_dim = [d for d in ds_t.dims if d not in ("y", "x", "latitude", "longitude", "lat", "lon")][0]
 
-    def _temp_var(ds):
-        for v in ds.data_vars:
-            vstr = str(ds[v].attrs.get("GRIB_shortName", v)).lower()
-            vlow = str(v).lower()
-            if (vstr in ("t", "tmp") or "tmp" in vlow) and "2" not in str(ds[v].dims):
-                return v
-        return next((v for v in ds.data_vars if "tmp" in str(v).lower() or v == "t"), list(ds.data_vars)[0])
-
     t_var = _temp_var(ds_t)
     T_da = ds_t[t_var]
 
-    # Load dewpoint separately so we always get real DPT (using T for Td gives CAPE/CIN 0)
+    # Dewpoint column at the same point, from the same decode
     td_1d_values = None
     pres_dpt = None
     try:
-        ds_dpt = H.xarray(":DPT:[0-9]+ mb", remove_grib=True)
-        if ds_dpt is not None:
-            if isinstance(ds_dpt, list):
-                ds_dpt = next((d for d in ds_dpt if "isobaricInhPa" in d.dims or "isobaric" in str(d.dims).lower()), ds_dpt[0] if ds_dpt else None)
-            if ds_dpt is not None:
-                dpt_pdim = next((d for d in ds_dpt.dims if "isobaric" in d.lower() or "pressure" in d.lower()), pres_dim)
-                dpt_var = None
-                for v in ds_dpt.data_vars:
-                    vstr = str(ds_dpt[v].attrs.get("GRIB_shortName", v)).lower()
-                    if "dpt" in vstr or "dp" == vstr or "dpt" in str(v).lower():
-                        dpt_var = v
-                        break
-                if dpt_var is None:
-                    dpt_var = next((v for v in ds_dpt.data_vars if "dpt" in str(v).lower() or "dew" in str(v).lower()), list(ds_dpt.data_vars)[0])
-                Td_da = ds_dpt[dpt_var]
-                if "y" in Td_da.dims and "x" in Td_da.dims:
-                    Td_1d = Td_da.isel(y=iy, x=ix)
-                elif "latitude" in Td_da.dims:
-                    Td_1d = Td_da.isel(latitude=iy, longitude=ix)
-                else:
-                    Td_1d = Td_da.isel({d: 0 for d in Td_da.dims if d != dpt_pdim})
-                td_1d_values = np.atleast_1d(Td_1d.values).flatten()
-                pres_dpt = np.asarray(Td_1d[dpt_pdim].values)
-                if hasattr(pres_dpt, "magnitude"):
-                    pres_dpt = pres_dpt.magnitude
+        dpt_pdim = next((d for d in ds_dpt.dims if "isobaric" in d.lower() or "pressure" in d.lower()), pres_dim)
+        Td_da = ds_dpt[_dpt_var(ds_dpt)]
+        if "y" in Td_da.dims and "x" in Td_da.dims:
+            Td_1d = Td_da.isel(y=iy, x=ix)
+        elif "latitude" in Td_da.dims:
+            Td_1d = Td_da.isel(latitude=iy, longitude=ix)
+        else:
+            Td_1d = Td_da.isel({d: 0 for d in Td_da.dims if d != dpt_pdim})
+        if dpt_pdim in Td_1d.coords:
+            Td_1d = Td_1d.sortby(dpt_pdim, ascending=False)
+        td_1d_values = np.atleast_1d(Td_1d.values).ravel()
+        pres_dpt = np.asarray(Td_1d[dpt_pdim].values)
+        if hasattr(pres_dpt, "magnitude"):
+            pres_dpt = pres_dpt.magnitude
     except Exception:
         pass
 
@@ -132,53 +228,48 @@ def get_model_sounding(
         T_1d = T_da.isel(latitude=iy, longitude=ix)
     else:
         T_1d = T_da.isel({d: 0 for d in T_da.dims if d != pres_dim})
+    # Order surface-up (pressure descending) in xarray, so T, Td and p share one ordering from here on
+    if pres_dim in T_1d.coords:
+        T_1d = T_1d.sortby(pres_dim, ascending=False)
 
     pres = np.asarray(T_1d[pres_dim].values)
     if hasattr(pres, "magnitude"):
         pres = pres.magnitude
-    t_k = np.atleast_1d(T_1d.values).flatten()
+    t_k = np.atleast_1d(T_1d.values).ravel()
     # Align DPT to T's pressure levels (models use same isobaric set; match by pressure)
     if pres_dpt is not None and len(pres_dpt) == len(pres) and np.allclose(pres, pres_dpt):
         td_k = np.asarray(td_1d_values, dtype=float)
     else:
-        # Map DPT onto T pressures by nearest level
-        td_k = np.zeros_like(t_k, dtype=float)
-        for i, p in enumerate(pres):
-            j = np.argmin(np.abs(pres_dpt - p)) if pres_dpt is not None and len(pres_dpt) else 0
-            td_k[i] = td_1d_values[j] if j < len(td_1d_values) else t_k[i]
-
-    # Sort by pressure descending
-    order = np.argsort(pres)[::-1]
-    p_list = pres[order].tolist()
-    t_list = (t_k[order] - 273.15).tolist()
-    td_list = (td_k[order] - 273.15).tolist()
-
-    # Filter invalid
-    valid = [i for i in range(len(p_list)) if 50 < p_list[i] < 1050 and np.isfinite(t_list[i]) and np.isfinite(td_list[i])]
-    if len(valid) < 5:
+        # Map DPT onto T pressures by nearest level: one searchsorted over the sorted DPT pressures
+        j = np.zeros(len(pres), dtype=np.intp)
+        if pres_dpt is not None and len(pres_dpt) > 1:
+            idx = np.argsort(pres_dpt)
+            sp = pres_dpt[idx]
+            k = np.clip(np.searchsorted(sp, pres), 1, len(sp) - 1)
+            # Step back to the lower neighbour where it is at least as close
+            k -= np.abs(pres - sp[k - 1]) <= np.abs(sp[k] - pres)
+            j = idx[k]
+        n_td = len(td_1d_values)
+        td_k = np.where(j < n_td, td_1d_values[np.minimum(j, n_td - 1)] if n_td else t_k, t_k)
+
+    # (p, T_C, Td_C) rows; one mask drops invalid levels and one tolist() converts what's left
+    arr = np.empty((3, len(pres)))
+    arr[0] = pres
+    # Kelvin -> Celsius written straight into the rows: no temporaries
+    np.subtract(t_k, 273.15, out=arr[1])
+    np.subtract(td_k, 273.15, out=arr[2])
+    valid = (arr[0] > 50) & (arr[0] < 1050) & np.isfinite(arr[1]) & np.isfinite(arr[2])
+    if np.count_nonzero(valid) < 5:
         return None
-    p_list = [p_list[i] for i in valid]
-    t_list = [t_list[i] for i in valid]
-    td_list = [td_list[i] for i in valid]
+    p_list, t_list, td_list = arr[:, valid].tolist()
 
     try:
-        from metpy.units import units
-        from metpy.calc import cape_cin, parcel_profile
-
-        p = np.array(p_list) * units.hPa
-        T = np.array(t_list) * units.degC
-        Td = np.array(td_list) * units.degC
-        parcel = parcel_profile(p, T[0], Td[0])
-        cape, cin = cape_cin(p, T, Td, parcel)
-        cape_val = float(cape.to(units("J/kg")).magnitude) if cape is not None else 0.0
-        cin_val = float(cin.to(units("J/kg")).magnitude) if cin is not None else 0.0
+        cape_val, cin_val = surface_cape_cin(p_list, t_list, td_list)
     except Exception:
         cape_val, cin_val = 0.0, 0.0
 
-    profile = [
-        {"p_hpa": float(pi), "T_C": float(ti), "Td_C": float(tdi)}
-        for pi, ti, tdi in zip(p_list, t_list, td_list)
-    ]
+    # Columns from the single tolist() above are already Python floats: no per-value float() casts
+    profile = [{"p_hpa": pi, "T_C": ti, "Td_C": tdi} for pi, ti, tdi in zip(p_list, t_list, td_list)]
 
     return {
         "source": model,
@@ -4,10 +4,12 @@ Sources: wyoming (observed), rap/hrrr (model), or demo when no lat/lon.
 """
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Any
 
 from app.nws.cache import model_sounding_cache
-from app.physics.model_sounding import _run_time_utc, get_model_sounding
+from app.physics._thermo import _metpy
+from app.physics.model_sounding import get_model_sounding
 from app.physics.uwyo_sounding import get_real_sounding
 
 
@@ -20,8 +22,9 @@ def get_sounding(
     if lat is not None and lon is not None:
         source_lower = (source or "wyoming").lower()
         if source_lower in ("rap", "hrrr"):
-            run_time = _run_time_utc()
-            cache_key = f"model_sounding:{source_lower}:{lat:.2f}:{lon:.2f}:{run_time}"
+            # No run time in the key: the TTL bounds staleness, and an entry stays useful across a cycle boundary
+            # while the new run isn't published yet
+            cache_key = f"model_sounding:{source_lower}:{lat:.2f}:{lon:.2f}"
             cached = model_sounding_cache.get(cache_key)
             if cached is not None:
                 return cached
@@ -45,10 +48,18 @@ def get_sounding(
 
 def get_sounding_demo() -> dict[str, Any]:
     """Return a demo sounding with CAPE/CIN and profile (pressure, T, Td)."""
+    demo = _compute_demo()
+    # Fresh dict and rows per call, so a caller mutating the result can't change the memoized one
+    return {**demo, "profile": [dict(row) for row in demo["profile"]]}
+
+
+@lru_cache(maxsize=1)
+def _compute_demo() -> dict[str, Any]:
+    """The demo sounding is fixed data, so MetPy runs once per process."""
     try:
         import numpy as np
-        from metpy.units import units
-        from metpy.calc import cape_cin, parcel_profile, dewpoint_from_relative_humidity
+
+        units, cape_cin, parcel_profile, dewpoint_from_relative_humidity = _metpy()
 
         p = np.array([1000, 950, 900, 850, 800, 750, 700, 650, 600, 550, 500, 450, 400, 350, 300, 250, 200]) * units.hPa
         T = np.array([24, 22, 19, 15, 11, 7, 3, -2, -7, -13, -20, -28, -37, -47, -55, -58, -52]) * units.degC
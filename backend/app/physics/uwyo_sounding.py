@@ -4,10 +4,38 @@ Find nearest station to (lat, lon), fetch latest sounding, return profile + CAPE
 """
 from __future__ import annotations
 
+import asyncio
+import atexit
+import bisect
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any
 import math
+import re
 import httpx
+import numpy as np
+
+from app.physics._thermo import cape_cin_batch, surface_cape_cin
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # SciPy optional: nearest_station falls back to a linear scan
+    cKDTree = None
+
+# One pooled client for all Wyoming fetches: the 1200Z/0000Z retries and later requests reuse the TLS connection
+_WYOMING_CLIENT = httpx.Client(
+    http2=True,
+    timeout=15.0,
+    follow_redirects=True,
+    limits=httpx.Limits(max_keepalive_connections=4),
+)
+atexit.register(_WYOMING_CLIENT.close)
+
+# Column header line that opens the data block of a TEXT:LIST sounding
+_HEADER_RE = re.compile(r"^.*PRES.*HGHT.*TEMP.*$", re.MULTILINE)
+# Data row: numeric pressure, then the TEMP and DWPT fields (3rd and 4th whitespace-separated columns)
+_ROW_RE = re.compile(r"^[ \t]*(\d+(?:\.\d*)?)[ \t]+\S+[ \t]+(\S+)[ \t]+(\S+)", re.MULTILINE)
 
 # WMO upper-air station id, lat, lon (US rawinsonde network for Wyoming soundings)
 # More stations = better coverage so distant locations get different nearest stations
@@ -45,16 +73,51 @@ UPPER_AIR_STATIONS = [
 ]
 
 
+# Built once at import: nearest_station is a KD-tree query (or a pruned scan) instead of a full Python loop
+_STATION_IDS = np.array([s[0] for s in UPPER_AIR_STATIONS])
+_STATION_COORDS = np.array([(s[1], s[2]) for s in UPPER_AIR_STATIONS], dtype=np.float64)
+_STATION_TREE = cKDTree(_STATION_COORDS) if cKDTree is not None else None
+# No-SciPy fallback: (lat, list index, lon, id) sorted by latitude, scanned outward from the query latitude
+_BY_LAT = sorted((slat, i, slon, stid) for i, (stid, slat, slon) in enumerate(UPPER_AIR_STATIONS))
+_BY_LAT_LATS = [s[0] for s in _BY_LAT]
+
+
+def _nearest_by_lat(lat: float, lon: float) -> tuple[int, float, float]:
+    """Scan stations outward in latitude from lat; stop once dlat^2 alone exceeds the best squared distance."""
+    n = len(_BY_LAT)
+    hi = bisect.bisect_left(_BY_LAT_LATS, lat)
+    lo = hi - 1
+    best_d2 = math.inf
+    best = _BY_LAT[0]
+    while True:
+        dlo = lat - _BY_LAT_LATS[lo] if lo >= 0 else math.inf
+        dhi = _BY_LAT_LATS[hi] - lat if hi < n else math.inf
+        if dlo <= dhi:
+            if dlo * dlo > best_d2:
+                break
+            s = _BY_LAT[lo]
+            lo -= 1
+        else:
+            if dhi * dhi > best_d2:
+                break
+            s = _BY_LAT[hi]
+            hi += 1
+        d2 = (lat - s[0]) ** 2 + (lon - s[2]) ** 2
+        # Ties go to the earlier list entry, like a scan of UPPER_AIR_STATIONS in order
+        if d2 < best_d2 or (d2 == best_d2 and s[1] < best[1]):
+            best_d2 = d2
+            best = s
+    return best[3], best[0], best[2]
+
+
 def nearest_station(lat: float, lon: float) -> tuple[int, float, float]:
     """Return (station_id, lat, lon) for nearest upper-air station."""
-    best = None
-    best_d = 1e9
-    for stid, slat, slon in UPPER_AIR_STATIONS:
-        d = math.sqrt((lat - slat) ** 2 + (lon - slon) ** 2)
-        if d < best_d:
-            best_d = d
-            best = (stid, slat, slon)
-    return best or (72215, 25.8, -80.3)
+    if not (math.isfinite(lat) and math.isfinite(lon)):
+        return (72215, 25.8, -80.3)
+    if _STATION_TREE is None:
+        return _nearest_by_lat(lat, lon)
+    _, i = _STATION_TREE.query((lat, lon), k=1)
+    return int(_STATION_IDS[i]), float(_STATION_COORDS[i, 0]), float(_STATION_COORDS[i, 1])
 
 
 def fetch_wyoming_sounding(station_id: int, from_time: str = "1200") -> str:
@@ -65,41 +128,66 @@ def fetch_wyoming_sounding(station_id: int, from_time: str = "1200") -> str:
         f"?region=naconf&TYPE=TEXT%3ALIST&YEAR={now.year}&MONTH={now.month}&DAY={now.day}"
         f"&FROM={from_time}&TO={from_time}&STNM={station_id}"
     )
-    with httpx.Client(timeout=15.0, follow_redirects=True) as client:
-        resp = client.get(url)
-        resp.raise_for_status()
-        return resp.text
+    resp = _WYOMING_CLIENT.get(url)
+    resp.raise_for_status()
+    return resp.text
 
 
 def parse_wyoming_text(text: str) -> tuple[list[float], list[float], list[float]]:
     """Parse Wyoming sounding text. Returns (p_hpa, T_C, Td_C) lists. Only rows with valid T and Td."""
-    p_list, t_list, td_list = [], [], []
-    in_data = False
-    for line in text.splitlines():
-        if "PRES" in line and "HGHT" in line and "TEMP" in line:
-            in_data = True
-            continue
-        if not in_data:
-            continue
-        if line.strip() == "" or line.startswith("Station") or line.startswith("("):
-            continue
-        parts = line.split()
-        if len(parts) < 4:
+    p_t, t_t, td_t = _parse_wyoming_cached(text)
+    return list(p_t), list(t_t), list(td_t)
+
+
+@lru_cache(maxsize=64)
+def _parse_wyoming_cached(text: str) -> tuple[tuple[float, ...], tuple[float, ...], tuple[float, ...]]:
+    """Memoized parse keyed on the response text; tuples so callers can't mutate the cached rows."""
+    header = _HEADER_RE.search(text)
+    if header is None:
+        return (), (), ()
+    stop = text.find("</PRE>", header.end())
+    rows = []
+    # One regex scan over the data block; unit/separator lines and short rows never match
+    for m in _ROW_RE.finditer(text, header.end(), stop if stop >= 0 else len(text)):
+        pres, temp, dwpt = m.groups()
+        if temp == "***" or dwpt == "***":
             continue
         try:
-            pres = float(parts[0])
-            temp = float(parts[2]) if parts[2] != "***" else None
-            dwpt = float(parts[3]) if parts[3] != "***" else None
-            if pres < 50 or pres > 1050:
-                continue
-            if temp is None or dwpt is None:
-                continue
-            p_list.append(pres)
-            t_list.append(temp)
-            td_list.append(dwpt)
-        except (ValueError, IndexError):
+            row = (float(pres), float(temp), float(dwpt))
+        except ValueError:
             continue
-    return p_list, t_list, td_list
+        if 50 <= row[0] <= 1050 and math.isfinite(row[1]) and math.isfinite(row[2]):
+            rows.append(row)
+    if not rows:
+        return (), (), ()
+    p_t, t_t, td_t = zip(*rows)
+    return p_t, t_t, td_t
+
+
+def _station_result(
+    station_id: int,
+    slat: float,
+    slon: float,
+    from_time: str,
+    p_list: list[float],
+    t_list: list[float],
+    td_list: list[float],
+    cape_val: float,
+    cin_val: float,
+) -> dict[str, Any]:
+    """Response dict for one station sounding (same shape as the model and demo soundings)."""
+    # Parsed columns are already Python floats: no per-value float() casts
+    profile = [{"p_hpa": pi, "T_C": ti, "Td_C": tdi} for pi, ti, tdi in zip(p_list, t_list, td_list)]
+    return {
+        "source": "uwyo",
+        "station_id": station_id,
+        "station_lat": slat,
+        "station_lon": slon,
+        "from_time": from_time,
+        "cape_j_kg": round(cape_val, 1),
+        "cin_j_kg": round(cin_val, 1),
+        "profile": profile,
+    }
 
 
 def get_real_sounding(lat: float, lon: float) -> dict[str, Any] | None:
@@ -117,35 +205,64 @@ def get_real_sounding(lat: float, lon: float) -> dict[str, Any] | None:
             p_list, t_list, td_list = parse_wyoming_text(text)
             if len(p_list) < 5:
                 continue
-            import numpy as np
-            from metpy.units import units
-            from metpy.calc import cape_cin, parcel_profile
-
-            p = np.array(p_list) * units.hPa
-            T = np.array(t_list) * units.degC
-            Td = np.array(td_list) * units.degC
-            if len(p) < 5:
-                continue
-            parcel = parcel_profile(p, T[0], Td[0])
-            cape, cin = cape_cin(p, T, Td, parcel)
-            cape_val = float(cape.to(units("J/kg")).magnitude) if cape is not None else 0.0
-            cin_val = float(cin.to(units("J/kg")).magnitude) if cin is not None else 0.0
-            profile = [
-                {"p_hpa": float(pi), "T_C": float(ti), "Td_C": float(tdi)}
-                for pi, ti, tdi in zip(p.magnitude, T.magnitude, Td.magnitude)
-            ]
-            result = {
-                "source": "uwyo",
-                "station_id": station_id,
-                "station_lat": slat,
-                "station_lon": slon,
-                "from_time": from_time,
-                "cape_j_kg": round(cape_val, 1),
-                "cin_j_kg": round(cin_val, 1),
-                "profile": profile,
-            }
+            cape_val, cin_val = surface_cape_cin(p_list, t_list, td_list)
+            result = _station_result(station_id, slat, slon, from_time, p_list, t_list, td_list, cape_val, cin_val)
             wyoming_sounding_cache.set(key, result)
             return result
         except Exception:
             continue
     return None
+
+
+async def get_sounding_warmup_all(max_workers: int = 4) -> int:
+    """
+    Fetch the latest sounding of every upper-air station and cache it, with CAPE/CIN for all of them computed
+    in one batch. Stations already cached or without data are skipped. Returns the number of soundings cached.
+    """
+    from app.nws.cache import wyoming_sounding_cache
+
+    def fetch(station: tuple[int, float, float]) -> tuple | None:
+        stid, slat, slon = station
+        for from_time in ("1200", "0000"):
+            try:
+                p_list, t_list, td_list = parse_wyoming_text(fetch_wyoming_sounding(stid, from_time))
+            except Exception:
+                continue
+            if len(p_list) >= 5:
+                return stid, slat, slon, from_time, p_list, t_list, td_list
+        return None
+
+    # Worker threads only fetch and parse; the cache (no lock) and the CAPE batch stay on the event loop
+    pending = [
+        station for station in UPPER_AIR_STATIONS
+        if all(wyoming_sounding_cache.get(f"wyoming_sounding:{station[0]}:{ft}") is None for ft in ("1200", "0000"))
+    ]
+    loop = asyncio.get_running_loop()
+    # Network-bound: a few fetches in flight over the pooled client's keepalive connections
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        results = await asyncio.gather(*(loop.run_in_executor(pool, fetch, station) for station in pending))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    fetched = [f for f in results if f is not None]
+    if not fetched:
+        return 0
+
+    # One row per station, NaN-padded to the longest profile
+    nlev = max(len(f[4]) for f in fetched)
+    p = np.full((len(fetched), nlev), np.nan)
+    t = np.full_like(p, np.nan)
+    td = np.full_like(p, np.nan)
+    for r, f in enumerate(fetched):
+        n = len(f[4])
+        p[r, :n], t[r, :n], td[r, :n] = f[4], f[5], f[6]
+    cape, cin = cape_cin_batch(p, t, td)
+
+    cached = 0
+    for r, (stid, slat, slon, from_time, p_list, t_list, td_list) in enumerate(fetched):
+        if not (math.isfinite(cape[r]) and math.isfinite(cin[r])):
+            continue  # left for get_real_sounding, which falls back to MetPy
+        result = _station_result(stid, slat, slon, from_time, p_list, t_list, td_list, float(cape[r]), float(cin[r]))
+        wyoming_sounding_cache.set(f"wyoming_sounding:{stid}:{from_time}", result)
+        cached += 1
+    return cached
@@ -0,0 +1,14 @@
+"""JSON response class backed by orjson (serializes NumPy arrays without .tolist())."""
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class NumpyJSONResponse(JSONResponse):
+    """Like FastAPI's ORJSONResponse (deprecated upstream): orjson with OPT_SERIALIZE_NUMPY."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
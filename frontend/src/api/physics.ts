@@ -2,6 +2,7 @@ import { API_BASE } from "../config";
 
 export interface Advection1DResponse {
   x: number[];
+  stride: number;
   c: number;
   dt: number;
   dx: number;
@@ -26,6 +27,7 @@ export async function fetchAdvection1D(
 export interface Advection2DResponse {
   nx: number;
   ny: number;
+  stride: number;
   cx: number;
   cy: number;
   diffusion: number;